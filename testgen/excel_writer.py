@@ -17,14 +17,20 @@ We use lightweight heuristics parsing the generated pytest file contents:
 - Expected Output: derived from assert expressions or pytest.raises occurrences
 - Actual Output: left empty
 - Automation Pending: "Yes"
+
+For sharded output, write_excel_from_index() reads the shard index written by
+testgen.sharding and appends rows one shard at a time.
 """
 
 from pathlib import Path
 import ast
+import json
 import textwrap
-from typing import List, Dict
+from typing import Iterable, List, Dict
 from openpyxl import Workbook
 
+GENERATED_HEADER = "# GENERATED BY testgen - do not edit"
+
 # helper to safely unwrap AST function body to readable strings
 def _source_of_node(source: str, node: ast.AST) -> str:
     try:
@@ -60,6 +66,9 @@ def _extract_test_cases_from_source(source: str) -> List[Dict[str,str]]:
             i = lineno - 1
             while i >= 0:
                 line = lines[i].rstrip()
+                # the generated-file header is not part of any test's description
+                if line.strip() == GENERATED_HEADER:
+                    break
                 if line.strip().startswith("#"):
                     # collect comment content (strip '#')
                     desc_lines.insert(0, line.strip().lstrip("#").strip())
@@ -127,8 +136,33 @@ def write_excel_from_source(source: str, out_path: str):
     Write an xlsx file with the test case rows derived from `source`.
     out_path: str path to output file (overwrites if exists)
     """
-    testcases = _extract_test_cases_from_source(source)
+    _write_workbook(_extract_test_cases_from_source(source), out_path)
+
+
+def _iter_test_cases_from_index(index_path: str) -> Iterable[Dict[str, str]]:
+    """Yield test-case dictionaries shard by shard, parsing one module at a time."""
+    index_file = Path(index_path)
+    index = json.loads(index_file.read_text(encoding="utf-8"))
+    for shard in index.get("shards", []):
+        shard_file = index_file.parent / shard["file"]
+        if not shard_file.exists():
+            continue
+        try:
+            yield from _extract_test_cases_from_source(shard_file.read_text(encoding="utf-8"))
+        except SyntaxError:
+            # unsharded fallback output may not parse; nothing to export from it
+            continue
+
+
+def write_excel_from_index(index_path: str, out_path: str):
+    """
+    Write an xlsx file with the test case rows of every shard listed in `index_path`.
+    out_path: str path to output file (overwrites if exists)
+    """
+    _write_workbook(_iter_test_cases_from_index(index_path), out_path)
+
 
+def _write_workbook(testcases: Iterable[Dict[str, str]], out_path: str):
     wb = Workbook()
     ws = wb.active
     ws.title = "Test Cases"
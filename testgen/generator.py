@@ -1,17 +1,21 @@
 import ast
 from pathlib import Path
 
-from .llm_router import generate
+from .llm_router import generate, format_usage
 from .openai_client import DEFAULT_MODEL
 from .prompt import build_prompt
-from .reader import read_criterion
+from .reader import read_criterion, parse_feature_areas
 import configparser
-from pathlib import Path
-from .excel_writer import write_excel_from_source
+from .excel_writer import write_excel_from_index
+from .sharding import write_shards
 
 
 ROOT_DIR = Path(__file__).resolve().parents[1]
-OUTPUT_PATH = ROOT_DIR / "tests" / "test_generated.py"
+CONFIG_PATH = ROOT_DIR / "config.ini"
+# {criterion} expands to the criterion file stem so each spec gets its own directory
+CRITERION_PLACEHOLDER = "{criterion}"
+DEFAULT_OUTPUT_DIR = str(Path("tests") / "generated" / CRITERION_PLACEHOLDER)
+DEFAULT_EXCEL_PATH = str(Path(DEFAULT_OUTPUT_DIR) / "test_cases.xlsx")
 
 
 def strip_code_fence(text: str) -> str:
@@ -34,13 +38,52 @@ def is_valid_python(content: str) -> bool:
         return False
 
 
-def write_output_file(content: str):
-    d = OUTPUT_PATH.parent
-    d.mkdir(parents=True, exist_ok=True)
-    header = "# GENERATED BY testgen - do not edit\n"
-    if not content.startswith(header):
-        content = header + content
-    OUTPUT_PATH.write_text(content, encoding="utf-8")
+def _read_config() -> configparser.ConfigParser:
+    cp = configparser.ConfigParser()
+    if CONFIG_PATH.exists():
+        cp.read(CONFIG_PATH)
+    return cp
+
+
+def _expand_criterion(template: str, criterion_stem: str) -> str:
+    # plain replace: other braces in a path are kept as-is
+    return template.replace(CRITERION_PLACEHOLDER, criterion_stem)
+
+
+def _resolve_path(template: str, criterion_stem: str) -> Path:
+    p = Path(_expand_criterion(template, criterion_stem))
+    return p if p.is_absolute() else ROOT_DIR / p
+
+
+def output_dir_for(criterion_file: str) -> Path:
+    """Directory that receives the generated modules for criterion_file ([output] -> dir)."""
+    cp = _read_config()
+    template = cp["output"].get("dir", fallback=DEFAULT_OUTPUT_DIR) if "output" in cp else DEFAULT_OUTPUT_DIR
+    return _resolve_path(template, Path(criterion_file).stem)
+
+
+def write_output_file(content: str, criterion_file: str, criterion_text: str = "") -> Path:
+    """
+    Write generated tests for criterion_file as (optionally sharded) modules.
+    Sharding is configured under [output]: shard_by = none | feature | count,
+    max_tests_per_file = N. Returns the path of the shard index.
+    """
+    cp = _read_config()
+    shard_by = "none"
+    max_tests = 0
+    if "output" in cp:
+        shard_by = cp["output"].get("shard_by", fallback="none").strip().lower()
+        max_tests = cp["output"].getint("max_tests_per_file", fallback=0)
+
+    return write_shards(
+        content,
+        output_dir_for(criterion_file),
+        stem=Path(criterion_file).stem,
+        shard_by=shard_by,
+        feature_areas=parse_feature_areas(criterion_text),
+        max_tests_per_file=max_tests,
+        criterion_file=str(criterion_file),
+    )
 
 
 def orchestrate(criterion_file: str, model: str = None):
@@ -62,30 +105,30 @@ def orchestrate(criterion_file: str, model: str = None):
     except Exception:
         pass
     response_text = generate(prompt_block, model=model_to_use)
+    usage = format_usage()
+    if usage:
+        print(f"Token usage ({usage})")
 
     cleaned = strip_code_fence(response_text)
 
     if not is_valid_python(cleaned):
         print("Warning: generated code has syntax errors. Writing anyway for inspection.")
-        write_output_file(cleaned)
+        write_output_file(cleaned, criterion_file, crit)
         return
 
-    write_output_file(cleaned)
-    print(f"Wrote generated tests to {OUTPUT_PATH}")
+    index_path = write_output_file(cleaned, criterion_file, crit)
+    print(f"Wrote generated tests to {index_path.parent} (index: {index_path.name})")
 
     # --- optional Excel export controlled via config.ini ---
-    # config path (project root / config.ini)
-    conf_path = Path(__file__).resolve().parents[1] / "config.ini"
-    if conf_path.exists():
-        cp = configparser.ConfigParser()
-        cp.read(conf_path)
-        excel_enabled = False
-        excel_path = None
-        if "export" in cp:
-            excel_enabled = cp["export"].getboolean("excel", fallback=False)
-            excel_path = cp["export"].get("excel_path", fallback=str(Path("tests") / "test_cases.xlsx"))
-        if excel_enabled:
-            # write excel using the generated source
-            write_excel_from_source(cleaned, excel_path)
-            print(f"Wrote generated tests to excel file at: {excel_path}")
+    cp = _read_config()
+    excel_enabled = False
+    excel_path = None
+    if "export" in cp:
+        excel_enabled = cp["export"].getboolean("excel", fallback=False)
+        excel_path = cp["export"].get("excel_path", fallback=DEFAULT_EXCEL_PATH)
+    if excel_enabled:
+        # read the shards back through the index rather than the single generated source
+        excel_path = _expand_criterion(excel_path, Path(criterion_file).stem)
+        write_excel_from_index(index_path, excel_path)
+        print(f"Wrote generated tests to excel file at: {excel_path}")
 
@@ -8,11 +8,13 @@ Behaviour:
 - If fallback_enabled=true and primary fails, it will try fallback_provider.
 - Calls underlying client.generate(...) and adapts prompt format if necessary.
 - You can override provider per-call by passing _provider="ollama" (as a kwarg).
+- After each call, LAST_USAGE holds the token usage reported by the provider that
+  served it (e.g. cached prompt tokens for OpenAI, prompt eval count for Ollama).
 """
 
 import configparser
 from pathlib import Path
-from typing import Dict, Optional, Callable
+from typing import Dict, Optional, Callable, Tuple
 
 # ---- load config.ini ----
 ROOT = Path(__file__).resolve().parents[1]
@@ -28,22 +30,29 @@ DEFAULT_PROVIDER = _llm_section.get("provider", "openai").strip().lower()
 FALLBACK_ENABLED = _llm_section.get("fallback_enabled", "false").strip().lower() in ("1", "true", "yes")
 FALLBACK_PROVIDER = _llm_section.get("fallback_provider", "").strip().lower()
 
+# Usage of the most recent generate() call: {"provider": ..., <client token counters>}
+LAST_USAGE: Dict[str, Optional[object]] = {}
+
 
 # ---- lazy client import helpers ----
-def _import_openai_client() -> Callable[..., str]:
+# Each returns (generate, usage_getter); usage_getter() gives the client's last_usage.
+ClientPair = Tuple[Callable[..., str], Callable[[], Dict[str, Optional[int]]]]
+
+
+def _import_openai_client() -> ClientPair:
     try:
         # openai_client.generate(prompt_block: Dict, model=None, **kwargs) -> str
-        from .openai_client import generate as openai_generate
-        return openai_generate
+        from . import openai_client
+        return openai_client.generate, lambda: dict(openai_client.last_usage)
     except Exception as e:
         raise RuntimeError(f"OpenAI client import failed: {e}") from e
 
 
-def _import_ollama_client() -> Callable[..., str]:
+def _import_ollama_client() -> ClientPair:
     try:
         # ollama_client.generate(prompt: str or prompt_block, model=..., **kwargs) -> str
-        from .ollama_client import generate as ollama_generate
-        return ollama_generate
+        from . import ollama_client
+        return ollama_client.generate, lambda: dict(ollama_client.last_usage)
     except Exception as e:
         raise RuntimeError(f"Ollama client import failed: {e}") from e
 
@@ -92,6 +101,23 @@ def _call_client_adaptive(client_callable: Callable[..., str], prompt_block: Dic
         raise
 
 
+# ---- usage reporting ----
+def _record_usage(provider: str, usage_getter: Callable[[], Dict[str, Optional[int]]]):
+    """Store the serving client's usage, tagged with the provider, in LAST_USAGE."""
+    LAST_USAGE.clear()
+    LAST_USAGE["provider"] = provider
+    LAST_USAGE.update(usage_getter() or {})
+
+
+def format_usage(usage: Dict[str, Optional[object]] = None) -> str:
+    """Render usage as 'provider: key=value ...', skipping counters the provider did not report."""
+    usage = LAST_USAGE if usage is None else usage
+    if not usage:
+        return ""
+    counters = " ".join(f"{k}={v}" for k, v in usage.items() if k != "provider" and v is not None)
+    return f"{usage.get('provider', '?')}: {counters or 'no usage reported'}"
+
+
 # ---- main router function ----
 def generate(prompt_block: Dict[str, str], model: Optional[str] = None, **kwargs) -> str:
     """
@@ -108,8 +134,12 @@ def generate(prompt_block: Dict[str, str], model: Optional[str] = None, **kwargs
         if p not in _CLIENT_FACTORY:
             raise ValueError(f"Unknown LLM provider '{p}'. Supported: {list(_CLIENT_FACTORY.keys())}")
         client_factory = _CLIENT_FACTORY[p]
-        client = client_factory()  # may raise RuntimeError if import fails
-        return _call_client_adaptive(client, prompt_block, model, **kwargs)
+        client, usage_getter = client_factory()  # may raise RuntimeError if import fails
+        text = _call_client_adaptive(client, prompt_block, model, **kwargs)
+        _record_usage(p, usage_getter)
+        return text
+
+    LAST_USAGE.clear()
 
     # Try primary provider
     try:
@@ -5,29 +5,41 @@ Ollama client (quiet version).
 - Verifies model presence (best-effort).
 - Retries on timeouts with exponential backoff.
 - Minimal console logging (only warnings/errors).
+- Prefers /api/chat with separate system/user messages so the invariant system
+  prompt is an identical token prefix on every call and the server can reuse
+  its KV cache; keep_alive keeps the model (and that cache) loaded between
+  calls. Falls back to /api/generate on servers without the chat endpoint.
 """
 
 from .config_loader import load_config
 import requests
 import json
 import time
-from typing import Dict, Any, Tuple
+from typing import Dict, Any, List, Optional, Tuple
 
-cfg = load_config()
+cfg = load_config("ollama")
 OLLAMA_HOST = cfg.get("host", "http://localhost:11434").rstrip("/")
 DEFAULT_MODEL = cfg.get("model", "gemma3")
 
 DEFAULT_TIMEOUT = float(cfg.get("timeout_seconds", "60"))
 MAX_RETRIES = int(cfg.get("max_retries", "3"))
 RETRY_BACKOFF = float(cfg.get("retry_backoff", "5"))
+KEEP_ALIVE = cfg.get("keep_alive", "10m")
 
-_ENDPOINTS = ["/api/generate"]  # keep only the valid one
+_ENDPOINTS = ["/api/chat", "/api/generate"]  # chat first; generate for older servers
+
+# Token usage of the most recent generate() call; read by llm_router for reporting.
+last_usage: Dict[str, Optional[int]] = {}
 
 
 def _extract_text_from_response_json(data: Dict[str, Any]) -> Tuple[str, str]:
     if not isinstance(data, dict):
         return json.dumps(data), "raw_non_dict"
 
+    message = data.get("message")
+    if isinstance(message, dict) and isinstance(message.get("content"), str):
+        return message["content"], "message"
+
     for key in ("response", "result", "text", "output"):
         if key in data and isinstance(data[key], str):
             return data[key], key
@@ -53,8 +65,31 @@ def _extract_text_from_response_json(data: Dict[str, Any]) -> Tuple[str, str]:
     return json.dumps(data), "fallback_json"
 
 
-def _make_payload(prompt: str, model: str, endpoint: str) -> Dict:
-    return {"model": model, "prompt": prompt, "stream": False}
+def _make_payload(messages: List[Dict[str, str]], model: str, endpoint: str) -> Dict:
+    if endpoint == "/api/chat":
+        return {"model": model, "messages": messages, "stream": False, "keep_alive": KEEP_ALIVE}
+    # /api/generate: flatten with the system message first so the prefix stays stable
+    system = "".join(m["content"] for m in messages if m["role"] == "system")
+    user = "".join(m["content"] for m in messages if m["role"] == "user")
+    prompt = f"[System]\n{system}\n\n[User]\n{user}" if system else user
+    return {"model": model, "prompt": prompt, "stream": False, "keep_alive": KEEP_ALIVE}
+
+
+def _record_usage(data: Dict[str, Any]):
+    """
+    Store Ollama's token counters. prompt_eval_count only counts prompt tokens
+    that were actually evaluated, so it drops when the shared prefix is reused
+    from the KV cache; the server does not report cached tokens directly.
+    """
+    last_usage.clear()
+    if not isinstance(data, dict):
+        return
+    duration = data.get("prompt_eval_duration")
+    last_usage.update({
+        "prompt_eval_tokens": data.get("prompt_eval_count"),
+        "prompt_eval_ms": int(duration / 1e6) if isinstance(duration, (int, float)) else None,
+        "completion_tokens": data.get("eval_count"),
+    })
 
 
 def generate(prompt_block_or_str, model: str = None, timeout: float = None,
@@ -67,15 +102,20 @@ def generate(prompt_block_or_str, model: str = None, timeout: float = None,
     if isinstance(prompt_block_or_str, dict):
         system = prompt_block_or_str.get("system", "").strip()
         user = prompt_block_or_str.get("user", prompt_block_or_str.get("prompt", "")).strip()
-        prompt = f"[System]\n{system}\n\n[User]\n{user}" if system else user
+        messages = ([{"role": "system", "content": system}] if system else []) + \
+                   [{"role": "user", "content": user}]
     else:
-        prompt = str(prompt_block_or_str)
+        messages = [{"role": "user", "content": str(prompt_block_or_str)}]
 
     last_exc = None
+    last_usage.clear()
+    tried = []
 
     for ep in _ENDPOINTS:
         url = OLLAMA_HOST + ep
-        payload = _make_payload(prompt, model, ep)
+        payload = _make_payload(messages, model, ep)
+        tried.append(url)
+        not_found = False
 
         for attempt in range(max_retries + 1):
             try:
@@ -94,6 +134,7 @@ def generate(prompt_block_or_str, model: str = None, timeout: float = None,
 
             if resp.status_code == 404:
                 last_exc = RuntimeError(f"404 Not Found for endpoint {url}")
+                not_found = True
                 break
 
             try:
@@ -107,13 +148,20 @@ def generate(prompt_block_or_str, model: str = None, timeout: float = None,
                     data = resp.json()
                 except Exception:
                     return resp.text
+                _record_usage(data)
                 text, _ = _extract_text_from_response_json(data)
                 return text
             else:
                 return resp.text
 
+        # only a missing endpoint (older server without /api/chat) moves on to the
+        # next one; timeouts, connection and other HTTP errors fail fast so the
+        # router's fallback provider is not delayed by a second retry cycle
+        if not not_found:
+            break
+
     raise RuntimeError(
         f"Ollama API call failed. Last error: {last_exc}. "
-        f"Tried endpoints: {', '.join(OLLAMA_HOST + e for e in _ENDPOINTS)}. "
+        f"Tried endpoints: {', '.join(tried)}. "
         f"Model={model}"
     )
@@ -1,4 +1,4 @@
-from typing import Dict
+from typing import Dict, Optional
 
 import openai
 
@@ -14,6 +14,9 @@ if not API_KEY:
 # Create a client instance (new API style)
 client = openai.OpenAI(api_key=API_KEY)
 
+# Token usage of the most recent generate() call; read by llm_router for reporting.
+last_usage: Dict[str, Optional[int]] = {}
+
 
 def _messages_from_prompt_block(prompt_block: Dict[str, str]) -> list:
     messages = []
@@ -39,4 +42,19 @@ def generate(prompt_block: Dict[str, str],
     except Exception as e:
         raise RuntimeError(f"OpenAI API call failed: {e}") from e
 
+    _record_usage(resp)
     return resp.choices[0].message.content
+
+
+def _record_usage(resp):
+    """Store prompt/completion token counts, including prompt tokens served from the prompt cache."""
+    last_usage.clear()
+    usage = getattr(resp, "usage", None)
+    if usage is None:
+        return
+    details = getattr(usage, "prompt_tokens_details", None)
+    last_usage.update({
+        "prompt_tokens": getattr(usage, "prompt_tokens", None),
+        "cached_prompt_tokens": getattr(details, "cached_tokens", None) if details is not None else None,
+        "completion_tokens": getattr(usage, "completion_tokens", None),
+    })
@@ -1,26 +1,27 @@
 def build_prompt(criterion_text: str, target_framework: str = "pytest") -> dict:
-    """Builds system and user prompt for the OpenAI API."""
-    system = (
-        "As an expert software testing analyst, analyze the acceptance criteria."
-    )
+    """
+    Builds system and user prompt for the LLM API.
 
-    user = f"""
-    Requirement specification:
-    {criterion_text}
-    
-    
-    Task:
-    1) Generate a Python file that contains unit tests to validate the specification above.
-    2) Use plain {target_framework} style (functions named test_* and pytest.raises for exceptions).
-    3) Include necessary helper functions inside the test file (do not assume any external fixtures).
-    4) Do not include commentary, installation instructions, or markdown fences — output only the Python source code.
-    5) At the very top of the file, include this exact comment: "# GENERATED BY testgen - do not edit"
-    
-    
-    Constraints:
-    - Keep tests deterministic (no randomness).
-    - Prefer small example values, edge cases, and explicit exception checks.
-    - Assume the module under test will be imported as `from your_module import <function>`; include a short comment showing this import so users can update it.
+    The system message holds every invariant instruction and depends only on
+    target_framework, so it is byte-identical across calls and forms a shared
+    prefix that OpenAI prompt caching and Ollama's KV cache can reuse. The
+    variable requirement specification goes last, in the user message.
     """
+    system = f"""As an expert software testing analyst, analyze the acceptance criteria given by the user.
+
+Task:
+1) Generate a Python file that contains unit tests to validate the requirement specification.
+2) Use plain {target_framework} style (functions named test_* and pytest.raises for exceptions).
+3) Include necessary helper functions inside the test file (do not assume any external fixtures).
+4) Do not include commentary, installation instructions, or markdown fences — output only the Python source code.
+5) At the very top of the file, include this exact comment: "# GENERATED BY testgen - do not edit"
+
+Constraints:
+- Keep tests deterministic (no randomness).
+- Prefer small example values, edge cases, and explicit exception checks.
+- Assume the module under test will be imported as `from your_module import <function>`; include a short comment showing this import so users can update it.
+- Name each test after the feature area prefix of its criterion (e.g. "Login: ..." -> test_login_...)."""
+
+    user = f"Requirement specification:\n{criterion_text.strip()}"
 
-    return {"system": system, "user": user.strip()}
+    return {"system": system, "user": user}
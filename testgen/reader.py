@@ -1,3 +1,4 @@
+import re
 from pathlib import Path
 
 
@@ -7,3 +8,16 @@ def read_criterion(path: str) -> str:
     if not p.exists():
         raise FileNotFoundError(f"Criterion file not found: {path}")
     return p.read_text(encoding="utf-8").strip()
+
+
+def parse_feature_areas(criterion_text: str) -> list:
+    """
+    Return the feature areas named by criterion line prefixes, in first-seen order.
+    e.g. "1. Login: Valid credentials ..." -> "Login"
+    """
+    areas = []
+    for line in criterion_text.splitlines():
+        m = re.match(r"^\s*(?:[-*]|\d+[.)])?\s*([A-Za-z][\w /&-]{0,40}?)\s*:", line)
+        if m and m.group(1) not in areas:
+            areas.append(m.group(1))
+    return areas
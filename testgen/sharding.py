@@ -0,0 +1,277 @@
+# testgen/sharding.py
+"""
+Split a generated pytest module into shards and write them atomically.
+
+Sharding modes (config.ini [output] -> shard_by):
+- none:    a single module per criterion file.
+- feature: one module per feature area, taken from the criterion line prefix
+           (e.g. "1. Login: ..." -> test_<criterion>_login.py).
+- count:   fixed-size modules of at most max_tests_per_file tests.
+
+In feature mode, max_tests_per_file (when > 0) additionally splits oversized
+feature areas (test_<criterion>_login.py, test_<criterion>_login__2.py, ...). Every shard repeats the module preamble (imports, helpers) so it
+can be collected and imported on its own, which lets pytest-xdist spread them.
+
+All files are written via a temp file in the target directory followed by
+os.replace(), so concurrent runs never observe a half-written module. An index
+(_index.json) lists the shards and their tests so exporters can iterate them.
+"""
+
+import ast
+import json
+import os
+import re
+import uuid
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+HEADER = "# GENERATED BY testgen - do not edit\n"
+INDEX_NAME = "_index.json"
+SHARD_MODES = ("none", "feature", "count")
+MISC_FEATURE = "misc"
+
+
+def slugify(text: str) -> str:
+    """Lowercase text and collapse anything non-alphanumeric into single underscores."""
+    return re.sub(r"[^a-z0-9]+", "_", text.lower()).strip("_")
+
+
+def _create_temp_file(path: Path) -> Tuple[int, str]:
+    """
+    Create a uniquely named temp file next to path and return (fd, name).
+    Opened with mode 0o666 like a plain open(), so the process umask applies
+    as usual (tempfile.mkstemp would force 0600 on every generated file).
+    """
+    for _ in range(100):
+        tmp_name = str(path.parent / f".{path.name}.{uuid.uuid4().hex[:12]}.tmp")
+        try:
+            return os.open(tmp_name, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666), tmp_name
+        except FileExistsError:
+            continue
+    raise FileExistsError(f"Could not create a temp file next to {path}")
+
+
+def atomic_write_text(path: Path, content: str):
+    """
+    Write content to path via a temp file in the same directory and an atomic rename.
+    New files get the usual umask-filtered mode; an existing target keeps its mode.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        mode = path.stat().st_mode & 0o777
+    except FileNotFoundError:
+        mode = None
+    fd, tmp_name = _create_temp_file(path)
+    try:
+        if mode is not None:
+            os.chmod(tmp_name, mode)
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            fh.write(content)
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
+
+
+def _is_test_node(node: ast.AST) -> bool:
+    if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+        return node.name.startswith("test_")
+    if isinstance(node, ast.ClassDef):
+        return node.name.startswith("Test")
+    return False
+
+
+def _is_comment(line: str) -> bool:
+    return line.strip().startswith("#") and line.strip() != HEADER.strip()
+
+
+def _comment_block_start(lines: List[str], start: int, floor: int) -> int:
+    """
+    Return the first line of the comment block describing the test at lines[start].
+    Mirrors excel_writer: blank lines between the comment block and the def are
+    skipped, and the block ends at the next blank line or code. Returns start
+    unchanged when there is no such block.
+    """
+    i = start - 1
+    while i >= floor and not lines[i].strip():
+        i -= 1
+    if i < floor or not _is_comment(lines[i]):
+        return start
+    while i - 1 >= floor and _is_comment(lines[i - 1]):
+        i -= 1
+    return i
+
+
+def split_test_source(source: str) -> Tuple[str, List[Tuple[str, str]]]:
+    """
+    Split module source into (preamble, [(test_name, test_source), ...]).
+    Each test keeps its decorators and the comment block above it (the Excel
+    exporter reads that block as the description, see _comment_block_start). Everything else
+    - imports, helpers, module-level comments - goes into the preamble.
+    Raises SyntaxError if source cannot be parsed.
+    """
+    tree = ast.parse(source)
+    lines = source.splitlines()
+    consumed = [False] * len(lines)
+    tests = []
+
+    prev_end = 0
+    for node in tree.body:
+        if _is_test_node(node):
+            start = min([node.lineno] + [d.lineno for d in node.decorator_list]) - 1
+            start = _comment_block_start(lines, start, prev_end)
+            end = node.end_lineno
+            tests.append((node.name, "\n".join(lines[start:end]).rstrip()))
+            for i in range(start, end):
+                consumed[i] = True
+        prev_end = node.end_lineno
+
+    preamble_lines = [
+        line for i, line in enumerate(lines)
+        if not consumed[i] and line.strip() != HEADER.strip()
+    ]
+    preamble = re.sub(r"\n{3,}", "\n\n", "\n".join(preamble_lines)).strip()
+    return preamble, tests
+
+
+def _feature_of(test_name: str, feature_slugs: List[str]) -> str:
+    """Match a test name like test_login_empty_email to the longest feature slug it starts with."""
+    name = slugify(test_name)
+    if name.startswith("test_"):
+        name = name[len("test_"):]
+    best = MISC_FEATURE
+    for slug in feature_slugs:
+        if (name == slug or name.startswith(slug + "_")) and (best == MISC_FEATURE or len(slug) > len(best)):
+            best = slug
+    return best
+
+
+def _chunks(items: List, size: int) -> List[List]:
+    if size <= 0:
+        return [items]
+    return [items[i:i + size] for i in range(0, len(items), size)] or [[]]
+
+
+def plan_shards(tests: List[Tuple[str, str]], stem: str, shard_by: str,
+                feature_areas: List[str], max_tests_per_file: int = 0) -> List[Dict]:
+    """
+    Group tests into shards. Returns a list of
+    {"file": <module file name>, "feature": <slug or None>, "tests": [(name, source), ...]}.
+    """
+    if shard_by not in SHARD_MODES:
+        raise ValueError(f"Unknown shard_by '{shard_by}'. Supported: {list(SHARD_MODES)}")
+
+    base = f"test_{slugify(stem) or 'generated'}"
+
+    if shard_by == "none":
+        return [{"file": f"{base}.py", "feature": None, "tests": tests}]
+
+    if shard_by == "count":
+        chunks = _chunks(tests, max_tests_per_file)
+        return [{"file": f"{base}_part{i:03d}.py", "feature": None, "tests": chunk}
+                for i, chunk in enumerate(chunks, start=1)]
+
+    # feature mode: keep criterion order, unknown tests go to "misc"
+    slugs = [s for s in (slugify(f) for f in feature_areas) if s]
+    groups: Dict[str, List[Tuple[str, str]]] = {}
+    for name, src in tests:
+        groups.setdefault(_feature_of(name, slugs), []).append((name, src))
+
+    ordered = [s for s in dict.fromkeys(slugs) if s in groups]
+    if MISC_FEATURE in groups and MISC_FEATURE not in ordered:
+        ordered.append(MISC_FEATURE)
+
+    shards = []
+    for slug in ordered:
+        for i, chunk in enumerate(_chunks(groups[slug], max_tests_per_file), start=1):
+            # "__" never comes out of slugify(), so split parts cannot clash with
+            # a real feature slug (e.g. "Login" part 2 vs. a "Login 2" area)
+            suffix = f"{slug}" if i == 1 else f"{slug}__{i}"
+            shards.append({"file": f"{base}_{suffix}.py", "feature": slug, "tests": chunk})
+    return shards
+
+
+def _render_shard(preamble: str, tests: List[Tuple[str, str]]) -> str:
+    parts = [preamble] if preamble else []
+    parts.extend(src for _, src in tests)
+    return HEADER + "\n\n\n".join(parts) + "\n"
+
+
+def _is_own_shard_name(name, stem: str) -> bool:
+    """
+    True if name is a bare shard file name this criterion could have produced.
+    Guards stale-shard removal against edited or corrupted index entries
+    (paths like "../x" or unrelated files).
+    """
+    if not isinstance(name, str) or not name or Path(name).name != name:
+        return False
+    base = re.escape(f"test_{slugify(stem) or 'generated'}")
+    return re.fullmatch(rf"{base}(_[a-z0-9_]+)?\.py", name) is not None
+
+
+def read_index(out_dir: Path) -> Dict:
+    """Return the parsed _index.json in out_dir, or an empty index if there is none."""
+    index_path = Path(out_dir) / INDEX_NAME
+    if not index_path.exists():
+        return {"shards": []}
+    try:
+        return json.loads(index_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {"shards": []}
+
+
+def write_shards(source: str, out_dir: Path, stem: str, shard_by: str = "none",
+                 feature_areas: List[str] = None, max_tests_per_file: int = 0,
+                 criterion_file: str = None) -> Path:
+    """
+    Shard source into out_dir, write every module atomically, remove shards left
+    over from a previous run of the same criterion, and write the index last.
+    Source that cannot be parsed or contains no tests is written unsharded for
+    inspection.
+    Returns the index path.
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    try:
+        preamble, tests = split_test_source(source)
+    except SyntaxError:
+        tests = []
+
+    if tests:
+        shards = plan_shards(tests, stem, shard_by, feature_areas or [], max_tests_per_file)
+        rendered = [(s, _render_shard(preamble, s["tests"])) for s in shards]
+    else:
+        # nothing to shard (unparseable, or no test_*/Test* nodes): keep the raw output
+        shards = plan_shards([], stem, "none", [])
+        body = source if source.startswith(HEADER) else HEADER + source
+        rendered = [(shards[0], body)]
+
+    previous = {entry.get("file") for entry in read_index(out_dir).get("shards", [])}
+
+    for shard, content in rendered:
+        atomic_write_text(out_dir / shard["file"], content)
+
+    current = {shard["file"] for shard, _ in rendered}
+    for stale in previous - current:
+        if _is_own_shard_name(stale, stem):
+            (out_dir / stale).unlink(missing_ok=True)
+
+    index = {
+        "criterion": criterion_file,
+        "shard_by": shard_by,
+        "shards": [
+            {"file": shard["file"], "feature": shard["feature"],
+             "tests": [name for name, _ in shard["tests"]]}
+            for shard, _ in rendered
+        ],
+    }
+    index_path = out_dir / INDEX_NAME
+    atomic_write_text(index_path, json.dumps(index, indent=2) + "\n")
+    return index_path
@@ -1,73 +0,0 @@
-# GENERATED BY testgen - do not edit
-python
-# GENERATED BY testgen - do not edit
-# from your_module import login, signup, search, cart, checkout, profile # Assuming these functions are in your_module
-
-def test_login_valid_credentials():
-    assert login(email="test@example.com", password="password123") == True
-    assert True
-
-def test_login_invalid_password():
-    assert login(email="test@example.com", password="wrongpassword") == False
-    assert True
-
-def test_login_empty_email():
-    assert login(email="", password="password123") == False
-    assert True
-
-def test_login_empty_password():
-    assert login(email="test@example.com", password="") == False
-    assert True
-
-def test_signup_valid_password():
-    assert signup(email="test@example.com", password="P@$$wOrd") == True
-    assert True
-
-def test_signup_duplicate_email():
-    signup(email="test@example.com", password="P@$$wOrd")
-    assert signup(email="test@example.com", password="P@$$wOrd") == "An account with this email already exists."
-    assert True
-
-def test_search_valid_query():
-    search("iphone")
-    assert True
-
-def test_search_typo_suggestion():
-    search("iphne")
-    assert True
-
-def test_cart_add_item():
-    cart.add_item()
-    assert True
-
-def test_cart_remove_last_item():
-    cart.remove_last_item()
-    assert True
-
-def test_checkout_payment_success():
-    checkout.payment_success()
-    assert True
-
-def test_checkout_payment_failure():
-    checkout.payment_failure()
-    assert True
-
-def test_profile_update_display_name():
-    profile.update_display_name("New Name")
-    assert True
-
-def test_cart_responsive_320px():
-    cart.render_at_320px()
-    assert True
-
-def test_accessibility_image_alt_text():
-    assert cart.image_alt_text() == "test"
-    assert True
-
-def test_accessibility_modal_focus():
-    assert cart.modal_focus() == "test"
-    assert True
-
-def test_localization_french():
-    assert cart.locale_change("french") == "Bonjour"
-    assert True
\ No newline at end of file
@@ -0,0 +1,120 @@
+from types import SimpleNamespace
+
+import pytest
+
+from testgen import llm_router
+from testgen.prompt import build_prompt
+
+
+def test_build_prompt_system_is_stable_prefix():
+    a = build_prompt("1. Login: Valid credentials sign the user in.")
+    b = build_prompt("2. Cart: Adding an item updates the count.")
+    assert a["system"] == b["system"]
+    assert "Login: Valid credentials" not in a["system"]
+    assert "Login: Valid credentials" in a["user"]
+    assert "Cart: Adding an item" in b["user"]
+
+
+def test_build_prompt_system_depends_on_framework_only():
+    assert build_prompt("x", "pytest")["system"] != build_prompt("x", "unittest")["system"]
+
+
+def test_ollama_chat_payload_keeps_messages_and_keep_alive():
+    pytest.importorskip("requests")
+    from testgen import ollama_client
+
+    messages = [{"role": "system", "content": "S"}, {"role": "user", "content": "U"}]
+    payload = ollama_client._make_payload(messages, "m", "/api/chat")
+    assert payload == {"model": "m", "messages": messages, "stream": False,
+                       "keep_alive": ollama_client.KEEP_ALIVE}
+
+
+def test_ollama_generate_payload_flattens_system_first():
+    pytest.importorskip("requests")
+    from testgen import ollama_client
+
+    messages = [{"role": "system", "content": "S"}, {"role": "user", "content": "U"}]
+    payload = ollama_client._make_payload(messages, "m", "/api/generate")
+    assert payload["prompt"] == "[System]\nS\n\n[User]\nU"
+    assert payload["keep_alive"] == ollama_client.KEEP_ALIVE
+    assert "messages" not in payload
+
+    user_only = ollama_client._make_payload([{"role": "user", "content": "U"}], "m", "/api/generate")
+    assert user_only["prompt"] == "U"
+
+
+def test_ollama_extracts_chat_message_content():
+    pytest.importorskip("requests")
+    from testgen import ollama_client
+
+    data = {"message": {"role": "assistant", "content": "def test_x(): pass"}, "done": True}
+    assert ollama_client._extract_text_from_response_json(data) == ("def test_x(): pass", "message")
+
+
+def test_ollama_records_prompt_eval_usage():
+    pytest.importorskip("requests")
+    from testgen import ollama_client
+
+    ollama_client._record_usage({"prompt_eval_count": 12, "prompt_eval_duration": 5_000_000, "eval_count": 7})
+    assert ollama_client.last_usage == {"prompt_eval_tokens": 12, "prompt_eval_ms": 5, "completion_tokens": 7}
+
+
+def test_openai_records_cached_prompt_tokens():
+    pytest.importorskip("openai")
+    from testgen import openai_client
+
+    usage = SimpleNamespace(prompt_tokens=1200, completion_tokens=300,
+                            prompt_tokens_details=SimpleNamespace(cached_tokens=1024))
+    openai_client._record_usage(SimpleNamespace(usage=usage))
+    assert openai_client.last_usage == {"prompt_tokens": 1200, "cached_prompt_tokens": 1024,
+                                        "completion_tokens": 300}
+
+    openai_client._record_usage(SimpleNamespace(usage=SimpleNamespace(
+        prompt_tokens=10, completion_tokens=2, prompt_tokens_details=None)))
+    assert openai_client.last_usage["cached_prompt_tokens"] is None
+
+
+def test_format_usage_skips_missing_counters():
+    usage = {"provider": "ollama", "prompt_eval_tokens": 12, "prompt_eval_ms": None, "completion_tokens": 7}
+    assert llm_router.format_usage(usage) == "ollama: prompt_eval_tokens=12 completion_tokens=7"
+    assert llm_router.format_usage({"provider": "openai", "cached_prompt_tokens": None}) == \
+        "openai: no usage reported"
+    assert llm_router.format_usage({}) == ""
+
+
+def test_router_records_usage_from_client_getter(monkeypatch):
+    fake = lambda: ((lambda prompt_block, **kwargs: "ok"), lambda: {"prompt_eval_tokens": 5})
+    monkeypatch.setitem(llm_router._CLIENT_FACTORY, "ollama", fake)
+    assert llm_router.generate({"system": "s", "user": "u"}, _provider="ollama") == "ok"
+    assert llm_router.LAST_USAGE == {"provider": "ollama", "prompt_eval_tokens": 5}
+
+
+def test_ollama_falls_back_to_generate_only_on_404(monkeypatch):
+    requests = pytest.importorskip("requests")
+    from testgen import ollama_client
+
+    calls = []
+
+    def post(url, **kwargs):
+        calls.append(url.rsplit("/", 1)[-1])
+        if url.endswith("/api/chat"):
+            return SimpleNamespace(status_code=404)
+        return SimpleNamespace(status_code=200, raise_for_status=lambda: None,
+                               headers={"Content-Type": "application/json"},
+                               json=lambda: {"response": "ok"})
+
+    monkeypatch.setattr(ollama_client.requests, "post", post)
+    assert ollama_client.generate({"system": "s", "user": "u"}) == "ok"
+    assert calls == ["chat", "generate"]
+
+    calls.clear()
+
+    def timeout(url, **kwargs):
+        calls.append(url.rsplit("/", 1)[-1])
+        raise requests.exceptions.ReadTimeout("slow")
+
+    monkeypatch.setattr(ollama_client.requests, "post", timeout)
+    monkeypatch.setattr(ollama_client.time, "sleep", lambda s: None)
+    with pytest.raises(RuntimeError):
+        ollama_client.generate({"system": "s", "user": "u"}, max_retries=2)
+    assert calls == ["chat", "chat", "chat"]
@@ -0,0 +1,209 @@
+import json
+import os
+
+import pytest
+
+from testgen.reader import parse_feature_areas
+from testgen.sharding import (
+    HEADER,
+    INDEX_NAME,
+    atomic_write_text,
+    plan_shards,
+    split_test_source,
+    write_shards,
+)
+
+CRITERION = """# Acceptance Criteria
+1. Login: Valid credentials sign the user in.
+2. Login: Wrong password shows an error.
+3. Cart: Adding an item updates the count.
+- Search: Typos trigger a suggestion.
+Plain line without a prefix.
+"""
+
+SOURCE = HEADER + '''import pytest
+# from your_module import login, cart
+
+
+def _helper():
+    return 1
+
+
+# Valid credentials sign the user in
+def test_login_valid():
+    assert _helper() == 1
+
+
+@pytest.mark.parametrize("x", [1, 2])
+def test_login_wrong_password(x):
+    assert x
+
+
+def test_cart_add_item():
+    assert True
+
+
+def test_unrelated():
+    assert True
+'''
+
+
+def test_parse_feature_areas_reads_prefixes_in_order():
+    assert parse_feature_areas(CRITERION) == ["Login", "Cart", "Search"]
+
+
+def test_split_keeps_comment_block_and_decorators_with_test():
+    preamble, tests = split_test_source(SOURCE)
+    names = [name for name, _ in tests]
+    assert names == ["test_login_valid", "test_login_wrong_password", "test_cart_add_item", "test_unrelated"]
+    sources = dict(tests)
+    assert sources["test_login_valid"].startswith("# Valid credentials sign the user in\ndef test_login_valid")
+    assert sources["test_login_wrong_password"].startswith("@pytest.mark.parametrize")
+    assert "import pytest" in preamble
+    assert "def _helper" in preamble
+    assert HEADER.strip() not in preamble
+    assert "test_login_valid" not in preamble
+
+
+def test_split_attaches_comment_separated_by_blank_line():
+    source = HEADER + """import pytest
+
+# checks valid login
+
+def test_login_a():
+    assert True
+
+
+def test_cart_b():
+    assert True
+"""
+    preamble, tests = split_test_source(source)
+    assert "checks valid login" not in preamble
+    assert dict(tests)["test_login_a"].startswith("# checks valid login\n\ndef test_login_a")
+    assert not dict(tests)["test_cart_b"].startswith("#")
+
+
+def test_excel_descriptions_from_index_stay_with_their_test(tmp_path):
+    pytest.importorskip("openpyxl")
+    from testgen.excel_writer import _iter_test_cases_from_index
+
+    source = "# checks valid login\n\ndef test_login_a():\n    assert True\n\n\ndef test_cart_b():\n    assert True\n"
+    index_path = write_shards(source, tmp_path, "criterion", "feature", ["Login", "Cart"])
+    rows = {tc["name"]: tc["description"] for tc in _iter_test_cases_from_index(index_path)}
+    assert rows == {"test_login_a": "checks valid login", "test_cart_b": ""}
+
+
+def test_feature_shards_group_by_prefix_with_misc_bucket():
+    _, tests = split_test_source(SOURCE)
+    shards = plan_shards(tests, "criterion", "feature", ["Login", "Cart", "Search"])
+    assert [(s["file"], s["feature"], [n for n, _ in s["tests"]]) for s in shards] == [
+        ("test_criterion_login.py", "login", ["test_login_valid", "test_login_wrong_password"]),
+        ("test_criterion_cart.py", "cart", ["test_cart_add_item"]),
+        ("test_criterion_misc.py", "misc", ["test_unrelated"]),
+    ]
+
+
+def test_feature_shards_split_oversized_areas():
+    _, tests = split_test_source(SOURCE)
+    shards = plan_shards(tests, "criterion", "feature", ["Login"], max_tests_per_file=1)
+    assert [s["file"] for s in shards] == [
+        "test_criterion_login.py",
+        "test_criterion_login__2.py",
+        "test_criterion_misc.py",
+        "test_criterion_misc__2.py",
+    ]
+
+
+def test_split_shard_names_do_not_clash_with_feature_slugs(tmp_path):
+    source = HEADER + """
+def test_login_a():
+    assert True
+
+
+def test_login_b():
+    assert True
+
+
+def test_login_2_c():
+    assert True
+"""
+    index_path = write_shards(source, tmp_path, "criterion", "feature", ["Login", "Login 2"],
+                              max_tests_per_file=1)
+    index = json.loads(index_path.read_text(encoding="utf-8"))
+    files = [s["file"] for s in index["shards"]]
+    assert len(files) == len(set(files))
+    assert [(s["file"], s["tests"]) for s in index["shards"]] == [
+        ("test_criterion_login.py", ["test_login_a"]),
+        ("test_criterion_login__2.py", ["test_login_b"]),
+        ("test_criterion_login_2.py", ["test_login_2_c"]),
+    ]
+    assert "def test_login_b" in (tmp_path / "test_criterion_login__2.py").read_text(encoding="utf-8")
+
+
+def test_count_shards_are_numbered():
+    _, tests = split_test_source(SOURCE)
+    shards = plan_shards(tests, "My Spec", "count", [], max_tests_per_file=3)
+    assert [s["file"] for s in shards] == ["test_my_spec_part001.py", "test_my_spec_part002.py"]
+    assert [len(s["tests"]) for s in shards] == [3, 1]
+
+
+def test_write_shards_produces_importable_modules_and_index(tmp_path):
+    index_path = write_shards(SOURCE, tmp_path, "criterion", "feature", ["Login", "Cart"])
+    index = json.loads(index_path.read_text(encoding="utf-8"))
+    assert [s["file"] for s in index["shards"]] == [
+        "test_criterion_login.py", "test_criterion_cart.py", "test_criterion_misc.py"]
+    for shard in index["shards"]:
+        content = (tmp_path / shard["file"]).read_text(encoding="utf-8")
+        assert content.startswith(HEADER)
+        assert "def _helper" in content
+        compile(content, shard["file"], "exec")
+
+
+def test_write_shards_removes_stale_shards_only(tmp_path):
+    write_shards(SOURCE, tmp_path, "criterion", "feature", ["Login", "Cart"])
+    outside = tmp_path.parent / "outside.py"
+    outside.write_text("keep", encoding="utf-8")
+    index = json.loads((tmp_path / INDEX_NAME).read_text(encoding="utf-8"))
+    index["shards"].append({"file": "../outside.py"})
+    (tmp_path / INDEX_NAME).write_text(json.dumps(index), encoding="utf-8")
+
+    write_shards(SOURCE, tmp_path, "criterion", "count", [], max_tests_per_file=0)
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == [INDEX_NAME, "test_criterion_part001.py"]
+    assert outside.read_text(encoding="utf-8") == "keep"
+
+
+def test_write_shards_keeps_invalid_source_unsharded(tmp_path):
+    index_path = write_shards("def test_broken(:\n", tmp_path, "criterion", "feature", ["Login"])
+    index = json.loads(index_path.read_text(encoding="utf-8"))
+    assert [s["file"] for s in index["shards"]] == ["test_criterion.py"]
+    assert (tmp_path / "test_criterion.py").read_text(encoding="utf-8").startswith(HEADER)
+
+
+def test_write_shards_keeps_source_without_tests_unsharded(tmp_path):
+    write_shards(SOURCE, tmp_path, "criterion", "feature", ["Login", "Cart"])
+    source = "def helper():\n    return 1\n"
+    index_path = write_shards(source, tmp_path, "criterion", "feature", ["Login"])
+    index = json.loads(index_path.read_text(encoding="utf-8"))
+    assert [s["file"] for s in index["shards"]] == ["test_criterion.py"]
+    assert sorted(p.name for p in tmp_path.iterdir()) == [INDEX_NAME, "test_criterion.py"]
+    assert (tmp_path / "test_criterion.py").read_text(encoding="utf-8") == HEADER + source
+
+
+@pytest.mark.skipif(os.name == "nt", reason="POSIX file modes")
+def test_atomic_write_uses_umask_mode_and_keeps_existing_mode(tmp_path):
+    old_umask = os.umask(0o022)
+    try:
+        new_file = tmp_path / "new.py"
+        atomic_write_text(new_file, "x")
+        assert new_file.stat().st_mode & 0o777 == 0o644
+
+        existing = tmp_path / "existing.py"
+        existing.write_text("old", encoding="utf-8")
+        existing.chmod(0o640)
+        atomic_write_text(existing, "new")
+        assert existing.stat().st_mode & 0o777 == 0o640
+        assert existing.read_text(encoding="utf-8") == "new"
+    finally:
+        os.umask(old_umask)
+    assert [p.name for p in tmp_path.iterdir() if p.name.endswith(".tmp")] == []